@@ -2308,6 +2308,76 @@ USE_TZ = True
 
         self.assertTrue(is_valid_bucket_name("valid-formed-s3-bucket-name"))
         self.assertTrue(is_valid_bucket_name("worst.bucket.ever"))
+        # All-digit labels are fine as long as the whole name is not a
+        # 4-part dotted quad.
+        self.assertTrue(is_valid_bucket_name("123"))
+        self.assertTrue(is_valid_bucket_name("123.456"))
+        self.assertTrue(is_valid_bucket_name("1.2.3.4.5"))
+
+    def test_sqs_event_source_mapping_cache(self):
+        import zappa.utilities
+        from zappa.utilities import get_event_source
+
+        calls = []
+
+        class FakeLambdaClient:
+            def call(self, operation, **kwargs):
+                calls.append((operation, kwargs))
+                if operation == "list_event_source_mappings":
+                    if "Marker" not in kwargs:
+                        return {
+                            "EventSourceMappings": [
+                                {
+                                    "EventSourceArn": "arn:aws:sqs:us-east-1:1:q1",
+                                    "UUID": "uuid-1",
+                                }
+                            ],
+                            "NextMarker": "page-2",
+                        }
+                    return {
+                        "EventSourceMappings": [
+                            {
+                                "EventSourceArn": "arn:aws:sqs:us-east-1:1:q2",
+                                "UUID": "uuid-2",
+                            }
+                        ]
+                    }
+                return {}
+
+        def count_listings():
+            return len([c for c in calls if c[0] == "list_event_source_mappings"])
+
+        zappa.utilities._sqs_mapping_cache.clear()
+        with mock.patch(
+            "kappa.awsclient.create_client", return_value=FakeLambdaClient()
+        ):
+            event_source = {"arn": "arn:aws:sqs:us-east-1:1:q2", "events": []}
+            event_source_obj, ctx, funk = get_event_source(
+                event_source,
+                "arn:aws:lambda:us-east-1:1:function:f",
+                "test_settings.callback",
+                mock.Mock(),
+            )
+
+            # First lookup fills the cache from a paginated listing.
+            self.assertEqual(event_source_obj._get_uuid(funk), "uuid-2")
+            self.assertEqual(count_listings(), 2)
+            self.assertEqual(calls[1][1].get("Marker"), "page-2")
+
+            # Second lookup is a cache hit - no further API calls.
+            self.assertEqual(event_source_obj._get_uuid(funk), "uuid-2")
+            self.assertEqual(count_listings(), 2)
+
+            # add() invalidates the entry, so the next lookup re-lists.
+            event_source_obj.add(funk)
+            self.assertEqual(event_source_obj._get_uuid(funk), "uuid-2")
+            self.assertEqual(count_listings(), 4)
+
+            # remove() invalidates too.
+            event_source_obj.remove(funk)
+            self.assertEqual(event_source_obj._get_uuid(funk), "uuid-2")
+            self.assertEqual(count_listings(), 6)
+        zappa.utilities._sqs_mapping_cache.clear()
 
     # TODO: encountered error when vpc_config["SubnetIds"] or vpc_config["SecurityGroupIds"] is missing
     # We need to make the code more robust in this case and avoid the KeyError
@@ -308,7 +308,7 @@ def run_message(message):
                 "id": {"S": str(message["response_id"])},
                 "ttl": {"N": str(int(time.time() + 600))},
                 "async_status": {"S": "in progress"},
-                "async_response": {"S": str(json.dumps("N/A"))},
+                "async_response": {"S": json.dumps("N/A")},
             },
         )
 
@@ -324,7 +324,7 @@ def run_message(message):
             Key={"id": {"S": str(message["response_id"])}},
             UpdateExpression="SET async_response = :r, async_status = :s",
             ExpressionAttributeValues={
-                ":r": {"S": str(json.dumps(response))},
+                ":r": {"S": json.dumps(response)},
                 ":s": {"S": "complete"},
             },
         )
@@ -1,7 +1,4 @@
-import calendar
 import datetime
-import fnmatch
-import io
 import json
 import logging
 import os
@@ -9,6 +6,8 @@ import re
 import shutil
 import stat
 import sys
+import time
+from functools import lru_cache
 from urllib.parse import urlparse
 
 import botocore
@@ -31,11 +30,10 @@ def copytree(src, dst, metadata=True, symlinks=False, ignore=None):
     times are not copied.
     """
 
-    def copy_file(src, dst, item):
-        s = os.path.join(src, item)
-        d = os.path.join(dst, item)
+    copy_fn = shutil.copy2 if metadata else shutil.copy
 
-        if symlinks and os.path.islink(s):  # pragma: no cover
+    def copy_file(s, d, is_link, is_dir):
+        if symlinks and is_link:  # pragma: no cover
             if os.path.lexists(d):
                 os.remove(d)
             os.symlink(os.readlink(s), d)
@@ -46,27 +44,34 @@ def copytree(src, dst, metadata=True, symlinks=False, ignore=None):
                     os.lchmod(d, mode)
                 except:
                     pass  # lchmod not available
-        elif os.path.isdir(s):
+        elif is_dir:
             copytree(s, d, metadata, symlinks, ignore)
         else:
-            shutil.copy2(s, d) if metadata else shutil.copy(s, d)
+            copy_fn(s, d)
 
     try:
-        lst = os.listdir(src)
+        entries = list(os.scandir(src))
         if not os.path.exists(dst):
             os.makedirs(dst)
             if metadata:
                 shutil.copystat(src, dst)
     except NotADirectoryError:  # egg-link files
-        copy_file(os.path.dirname(src), os.path.dirname(dst), os.path.basename(src))
+        copy_file(src, dst, os.path.islink(src), os.path.isdir(src))
         return
 
     if ignore:
-        excl = ignore(src, lst)
-        lst = [x for x in lst if x not in excl]
+        excl = ignore(src, [entry.name for entry in entries])
+        entries = [entry for entry in entries if entry.name not in excl]
 
-    for item in lst:
-        copy_file(src, dst, item)
+    for entry in entries:
+        # DirEntry caches the lstat/stat results, so these checks don't
+        # hit the filesystem again per item.
+        copy_file(
+            entry.path,
+            os.path.join(dst, entry.name),
+            entry.is_symlink(),
+            entry.is_dir(),
+        )
 
 
 def parse_s3_url(url):
@@ -75,24 +80,29 @@ def parse_s3_url(url):
 
     Returns bucket (domain) and file (full path).
     """
-    bucket = ""
-    path = ""
-    if url:
-        result = urlparse(url)
-        bucket = result.netloc
-        path = result.path.strip("/")
-    return bucket, path
+    if not url:
+        return "", ""
+    # Fast path for the documented s3://bucket/path shape; urlparse runs
+    # a full URL state machine we don't need for it.
+    if url.startswith("s3://"):
+        bucket, _, path = url[5:].partition("/")
+        return bucket, path.strip("/")
+    result = urlparse(url)
+    return result.netloc, result.path.strip("/")
+
+
+_SIZE_UNITS = ("", "Ki", "Mi", "Gi", "Ti", "Pi", "Ei", "Zi", "Yi")
 
 
 def human_size(num, suffix="B"):
     """
     Convert bytes length to a human-readable version
     """
-    for unit in ("", "Ki", "Mi", "Gi", "Ti", "Pi", "Ei", "Zi"):
-        if abs(num) < 1024.0:
-            return "{0:3.1f}{1!s}{2!s}".format(num, unit, suffix)
-        num /= 1024.0
-    return "{0:.1f}{1!s}{2!s}".format(num, "Yi", suffix)
+    # bit_length gives the unit directly: each step is 10 bits (1024x).
+    index = min((abs(int(num)) or 1).bit_length() - 1, 89) // 10
+    return "{0:3.1f}{1!s}{2!s}".format(
+        num / (1 << (index * 10)), _SIZE_UNITS[index], suffix
+    )
 
 
 def string_to_timestamp(timestring):
@@ -100,22 +110,14 @@ def string_to_timestamp(timestring):
     Accepts a str, returns an int timestamp.
     """
 
-    ts = None
-
     # Uses an extended version of Go's duration string.
     try:
         delta = durationpy.from_str(timestring)
-        past = datetime.datetime.utcnow() - delta
-        ts = calendar.timegm(past.timetuple())
-        return ts
-    except Exception as e:
-        pass
+    except Exception:
+        return 0
 
-    if ts:
-        return ts
-    # else:
-    #     print("Unable to parse timestring.")
-    return 0
+    past = datetime.datetime.now(datetime.timezone.utc) - delta
+    return int(past.timestamp())
 
 
 ##
@@ -123,85 +125,100 @@ def string_to_timestamp(timestring):
 ##
 
 
+# Directories that never contain project code and are expensive to walk.
+_SKIP_DIRS = frozenset(
+    ("site-packages", ".git", ".tox", ".venv", "node_modules", "__pycache__")
+)
+
+
+def _scandir_rec(path):
+    """
+    Recursively yield DirEntry objects for the files under `path`,
+    pruning vendor directories and skipping symlinks.
+    """
+    try:
+        it = os.scandir(path)
+    except OSError:
+        # Match os.walk's default of silently skipping unreadable dirs.
+        return
+    with it:
+        for entry in it:
+            if entry.is_symlink():
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in _SKIP_DIRS:
+                    yield from _scandir_rec(entry.path)
+            else:
+                yield entry
+
+
 def detect_django_settings():
     """
     Automatically try to discover Django settings files,
     return them as relative module paths.
     """
 
+    cwd = os.getcwd()
+    # Paths from _scandir_rec are rooted at cwd, so stripping the prefix
+    # is enough - no per-file relpath computation needed.
+    prefix_len = len(os.path.join(cwd, ""))
     matches = []
-    for root, dirnames, filenames in os.walk(os.getcwd()):
-        for filename in fnmatch.filter(filenames, "*settings.py"):
-            full = os.path.join(root, filename)
-            if "site-packages" in full:
-                continue
-            full = os.path.join(root, filename)
-            package_path = full.replace(os.getcwd(), "")
-            package_module = (
-                package_path.replace(os.sep, ".").split(".", 1)[1].replace(".py", "")
-            )
-
-            matches.append(package_module)
+    for entry in _scandir_rec(cwd):
+        if entry.name.endswith("settings.py"):
+            package_path = entry.path[prefix_len:]
+            matches.append(package_path[:-3].replace(os.sep, "."))
     return matches
 
 
+# Matches e.g. `app = Flask(__name__)`, capturing the assigned name.
+_FLASK_ASSIGN_RE = re.compile(
+    r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*Flask\(", re.MULTILINE
+)
+
+
 def detect_flask_apps():
     """
     Automatically try to discover Flask apps files,
     return them as relative module paths.
     """
 
+    cwd = os.getcwd()
+    prefix_len = len(os.path.join(cwd, ""))
     matches = []
-    for root, dirnames, filenames in os.walk(os.getcwd()):
-        for filename in fnmatch.filter(filenames, "*.py"):
-            full = os.path.join(root, filename)
-            if "site-packages" in full:
-                continue
-
-            full = os.path.join(root, filename)
-
-            with io.open(full, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-                for line in lines:
-                    app = None
+    for entry in _scandir_rec(cwd):
+        if not entry.name.endswith(".py"):
+            continue
 
-                    # Kind of janky..
-                    if "= Flask(" in line:
-                        app = line.split("= Flask(")[0].strip()
-                    if "=Flask(" in line:
-                        app = line.split("=Flask(")[0].strip()
+        # Cheap membership test on the raw bytes before decoding anything.
+        with open(entry.path, "rb") as f:
+            data = f.read()
+        if b"Flask(" not in data:
+            continue
 
-                    if not app:
-                        continue
-
-                    package_path = full.replace(os.getcwd(), "")
-                    package_module = (
-                        package_path.replace(os.sep, ".")
-                        .split(".", 1)[1]
-                        .replace(".py", "")
-                    )
-                    app_module = package_module + "." + app
-
-                    matches.append(app_module)
+        text = data.decode("utf-8", errors="replace")
+        package_module = entry.path[prefix_len:-3].replace(os.sep, ".")
+        for match in _FLASK_ASSIGN_RE.finditer(text):
+            matches.append(package_module + "." + match.group(1))
 
     return matches
 
 
+@lru_cache(maxsize=None)
 def get_venv_from_python_version():
     return "python{}.{}".format(*sys.version_info)
 
 
+_RUNTIME_BY_MINOR = {6: "python3.6", 7: "python3.7", 8: "python3.8"}
+
+
+@lru_cache(maxsize=None)
 def get_runtime_from_python_version():
     """ """
-    if sys.version_info[0] < 3:
+    major, minor = sys.version_info[:2]
+    if major < 3:
         raise ValueError("Python 2.x is no longer supported.")
-    else:
-        if sys.version_info[1] <= 6:
-            return "python3.6"
-        elif sys.version_info[1] <= 7:
-            return "python3.7"
-        else:
-            return "python3.8"
+    # Clamp to the supported range, like the old if/elif ladder did.
+    return _RUNTIME_BY_MINOR[min(max(minor, 6), 8)]
 
 
 ##
@@ -218,17 +235,37 @@ def get_topic_name(lambda_name):
 # Event sources / Kappa
 ##
 
+# Per-function event source mappings, keyed by function name with
+# {event source arn: mapping uuid} values. One listing per function
+# replaces a list_event_source_mappings call per event source.
+_sqs_mapping_cache = {}
 
-def get_event_source(
-    event_source, lambda_arn, target_function, boto_session, dry=False
-):
-    """
 
-    Given an event_source dictionary item, a session and a lambda_arn,
-    hack into Kappa's Gibson, create out an object we can call
-    to schedule this event, and return the event source.
+class PseudoContext:
+    def __init__(self):
+        return
+
+
+class PseudoFunction:
+    def __init__(self):
+        return
+
+
+# ARN service -> kappa event source class, built once on first use.
+_event_source_map = None
+
 
+def _get_event_source_map():
     """
+    Import kappa and build the event source class map once per process.
+
+    The imports stay lazy because kappa isn't available inside the
+    deployed Lambda package, where this module is also loaded.
+    """
+    global _event_source_map
+    if _event_source_map is not None:
+        return _event_source_map
+
     import kappa.awsclient
     import kappa.event_source.base
     import kappa.event_source.cloudwatch
@@ -241,14 +278,6 @@ def get_event_source(
     import kappa.restapi
     import kappa.role
 
-    class PseudoContext:
-        def __init__(self):
-            return
-
-    class PseudoFunction:
-        def __init__(self):
-            return
-
     # Mostly adapted from kappa - will probably be replaced by kappa support
     class SqsEventSource(kappa.event_source.base.EventSource):
         def __init__(self, context, config):
@@ -256,16 +285,21 @@ def get_event_source(
             self._lambda = kappa.awsclient.create_client("lambda", context.session)
 
         def _get_uuid(self, function):
-            uuid = None
-            response = self._lambda.call(
-                "list_event_source_mappings",
-                FunctionName=function.name,
-                EventSourceArn=self.arn,
-            )
-            LOG.debug(response)
-            if len(response["EventSourceMappings"]) > 0:
-                uuid = response["EventSourceMappings"][0]["UUID"]
-            return uuid
+            mappings = _sqs_mapping_cache.get(function.name)
+            if mappings is None:
+                mappings = {}
+                kwargs = {"FunctionName": function.name}
+                while True:
+                    response = self._lambda.call("list_event_source_mappings", **kwargs)
+                    LOG.debug(response)
+                    for mapping in response["EventSourceMappings"]:
+                        mappings[mapping["EventSourceArn"]] = mapping["UUID"]
+                    marker = response.get("NextMarker")
+                    if not marker:
+                        break
+                    kwargs["Marker"] = marker
+                _sqs_mapping_cache[function.name] = mappings
+            return mappings.get(self.arn)
 
         def add(self, function):
             try:
@@ -277,6 +311,7 @@ def get_event_source(
                     Enabled=self.enabled,
                 )
                 LOG.debug(response)
+                _sqs_mapping_cache.pop(function.name, None)
             except Exception:
                 LOG.exception("Unable to add event source")
 
@@ -325,6 +360,7 @@ def get_event_source(
             if uuid:
                 response = self._lambda.call("delete_event_source_mapping", UUID=uuid)
                 LOG.debug(response)
+                _sqs_mapping_cache.pop(function.name, None)
             return response
 
         def status(self, function):
@@ -333,9 +369,7 @@ def get_event_source(
             uuid = self._get_uuid(function)
             if uuid:
                 try:
-                    response = self._lambda.call(
-                        "get_event_source_mapping", UUID=self._get_uuid(function)
-                    )
+                    response = self._lambda.call("get_event_source_mapping", UUID=uuid)
                     LOG.debug(response)
                 except botocore.exceptions.ClientError:
                     LOG.debug("event source %s does not exist", self.arn)
@@ -370,7 +404,7 @@ def get_event_source(
             if self.filters:
                 self.add_filters(function)
 
-    event_source_map = {
+    _event_source_map = {
         "dynamodb": kappa.event_source.dynamodb_stream.DynamoDBStreamEventSource,
         "kinesis": kappa.event_source.kinesis.KinesisEventSource,
         "s3": kappa.event_source.s3.S3EventSource,
@@ -379,6 +413,27 @@ def get_event_source(
         "events": kappa.event_source.cloudwatch.CloudWatchEventSource,
     }
 
+    def autoreturn(self, function_name):
+        return function_name
+
+    for event_source_class in _event_source_map.values():
+        event_source_class._make_notification_id = autoreturn
+
+    return _event_source_map
+
+
+def get_event_source(
+    event_source, lambda_arn, target_function, boto_session, dry=False
+):
+    """
+
+    Given an event_source dictionary item, a session and a lambda_arn,
+    hack into Kappa's Gibson, create out an object we can call
+    to schedule this event, and return the event source.
+
+    """
+    event_source_map = _get_event_source_map()
+
     arn = event_source["arn"]
     _, _, svc, _ = arn.split(":", 3)
 
@@ -386,11 +441,6 @@ def get_event_source(
     if not event_source_func:
         raise ValueError("Unknown event source: {0}".format(arn))
 
-    def autoreturn(self, function_name):
-        return function_name
-
-    event_source_func._make_notification_id = autoreturn
-
     ctx = PseudoContext()
     ctx.session = boto_session
 
@@ -481,6 +531,11 @@ def get_event_source_status(
 ##
 
 
+# Cached (monotonic timestamp, version) from the last PyPI lookup.
+_latest_version_cache = None
+_LATEST_VERSION_TTL = 3600  # seconds
+
+
 def check_new_version_available(this_version):
     """
     Checks if a newer version of Zappa is available.
@@ -488,11 +543,18 @@ def check_new_version_available(this_version):
     Returns True is updateable, else False.
 
     """
-    import requests
+    global _latest_version_cache
 
-    pypi_url = "https://pypi.org/pypi/Zappa/json"
-    resp = requests.get(pypi_url, timeout=1.5)
-    top_version = resp.json()["info"]["version"]
+    now = time.monotonic()
+    if _latest_version_cache and now - _latest_version_cache[0] < _LATEST_VERSION_TTL:
+        top_version = _latest_version_cache[1]
+    else:
+        import requests
+
+        pypi_url = "https://pypi.org/pypi/Zappa/json"
+        resp = requests.get(pypi_url, timeout=1.5)
+        top_version = resp.json()["info"]["version"]
+        _latest_version_cache = (now, top_version)
 
     return this_version != top_version
 
@@ -503,6 +565,9 @@ class InvalidAwsLambdaName(Exception):
     pass
 
 
+_LAMBDA_NAME_RE = re.compile(r"^[a-zA-Z0-9-_]+$")
+
+
 def validate_name(name, maxlen=80):
     """Validate name for AWS Lambda function.
     name: actual name (without `arn:aws:lambda:...:` prefix and without
@@ -527,7 +592,7 @@ def validate_name(name, maxlen=80):
     if len(name) == 0:
         msg = "Name must not be empty string."
         raise InvalidAwsLambdaName(msg)
-    if not re.match("^[a-zA-Z0-9-_]+$", name):
+    if not _LAMBDA_NAME_RE.match(name):
         msg = "Name can only contain characters from a-z, A-Z, 0-9, _ and -"
         raise InvalidAwsLambdaName(msg)
     return name
@@ -537,24 +602,24 @@ def contains_python_files_or_subdirs(folder):
     """
     Checks (recursively) if the directory contains .py or .pyc files
     """
-    for root, dirs, files in os.walk(folder):
-        if [
-            filename
-            for filename in files
-            if filename.endswith(".py") or filename.endswith(".pyc")
-        ]:
-            return True
-
-        for d in dirs:
-            for _, subdirs, subfiles in os.walk(d):
-                if [
-                    filename
-                    for filename in subfiles
-                    if filename.endswith(".py") or filename.endswith(".pyc")
-                ]:
-                    return True
+    subdirs = []
+    try:
+        it = os.scandir(folder)
+    except OSError:
+        # Match os.walk's default of silently skipping unreadable dirs.
+        return False
+    with it:
+        for entry in it:
+            if entry.is_file(follow_symlinks=False) and entry.name.endswith(
+                (".py", ".pyc")
+            ):
+                return True
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
 
-    return False
+    # Only recurse once the current directory has been ruled out, so a
+    # match near the top of the tree returns without walking the rest.
+    return any(contains_python_files_or_subdirs(subdir) for subdir in subdirs)
 
 
 def conflicts_with_a_neighbouring_module(directory_path):
@@ -575,6 +640,15 @@ def titlecase_keys(d):
     return {k.title(): v for k, v in d.items()}
 
 
+# Bucket names are lowercase letters, numbers, hyphens and periods,
+# starting and ending with a letter or number.
+_BUCKET_NAME_RE = re.compile(r"\A[a-z0-9]([a-z0-9.\-]{1,61}[a-z0-9])?\Z")
+# Each period-separated label must also start and end with a letter or
+# number, which additionally rejects adjacent periods.
+_BUCKET_LABEL_RE = re.compile(r"\A[a-z0-9]([a-z0-9\-]*[a-z0-9])?\Z")
+_IP_LIKE_RE = re.compile(r"\A\d+(\.\d+){3}\Z")
+
+
 # https://github.com/Miserlou/Zappa/issues/1688
 def is_valid_bucket_name(name):
     """
@@ -583,30 +657,12 @@ def is_valid_bucket_name(name):
     # Bucket names must be at least 3 and no more than 63 characters long.
     if len(name) < 3 or len(name) > 63:
         return False
-    # Bucket names must not contain uppercase characters or underscores.
-    if any(x.isupper() for x in name):
-        return False
-    if "_" in name:
+    if not _BUCKET_NAME_RE.match(name):
         return False
-    # Bucket names must start with a lowercase letter or number.
-    if not (name[0].islower() or name[0].isdigit()):
+    if not all(_BUCKET_LABEL_RE.match(label) for label in name.split(".")):
         return False
-    # Bucket names must be a series of one or more labels. Adjacent labels are separated by a single period (.).
-    for label in name.split("."):
-        # Each label must start and end with a lowercase letter or a number.
-        if len(label) < 1:
-            return False
-        if not (label[0].islower() or label[0].isdigit()):
-            return False
-        if not (label[-1].islower() or label[-1].isdigit()):
-            return False
     # Bucket names must not be formatted as an IP address (for example, 192.168.5.4).
-    looks_like_IP = True
-    for label in name.split("."):
-        if not label.isdigit():
-            looks_like_IP = False
-            break
-    if looks_like_IP:
+    if _IP_LIKE_RE.match(name):
         return False
 
     return True
@@ -619,10 +675,9 @@ def merge_headers(event):
     See: https://github.com/Miserlou/Zappa/pull/1756
     """
     headers = event.get("headers") or {}
-    multi_headers = (event.get("multiValueHeaders") or {}).copy()
-    for h in set(headers.keys()):
+    multi_headers = event.get("multiValueHeaders") or {}
+    merged = {h: ", ".join(values) for h, values in multi_headers.items()}
+    for h, value in headers.items():
         if h not in multi_headers:
-            multi_headers[h] = [headers[h]]
-    for h in multi_headers.keys():
-        multi_headers[h] = ", ".join(multi_headers[h])
-    return multi_headers
+            merged[h] = value
+    return merged
@@ -11,6 +11,18 @@ from .utilities import merge_headers, titlecase_keys
 
 BINARY_METHODS = ["POST", "PUT", "PATCH", "DELETE", "CONNECT", "OPTIONS"]
 
+# Built once at import time; constructing a formatter per request just
+# re-evaluates the same configuration for every log line.
+APACHE_FORMATTER_WITH_RT = ApacheFormatter(with_response_time=True)
+APACHE_FORMATTER_NO_RT = ApacheFormatter(with_response_time=False)
+
+LOGGER = logging.getLogger()
+
+# Which response-time keyword the installed requestlogger accepts
+# (newer releases take `rt_us`, older ones `rt_ms`). Resolved by the
+# first logged request so later ones skip the TypeError probe.
+_response_time_kwarg = None
+
 
 def create_wsgi_request(
     event_info,
@@ -163,30 +175,42 @@ def common_log(environ, response, response_time=None):
 
     """
 
-    logger = logging.getLogger()
+    status_code = response.status_code
+    content_length = len(response.content)
 
     if response_time:
-        formatter = ApacheFormatter(with_response_time=True)
-        try:
+        global _response_time_kwarg
+        formatter = APACHE_FORMATTER_WITH_RT
+        if _response_time_kwarg:
             log_entry = formatter(
-                response.status_code,
+                status_code,
                 environ,
-                len(response.content),
-                rt_us=response_time,
-            )
-        except TypeError:
-            # Upstream introduced a very annoying breaking change on the rt_ms/rt_us kwarg.
-            log_entry = formatter(
-                response.status_code,
-                environ,
-                len(response.content),
-                rt_ms=response_time,
+                content_length,
+                **{_response_time_kwarg: response_time},
             )
+        else:
+            try:
+                log_entry = formatter(
+                    status_code,
+                    environ,
+                    content_length,
+                    rt_us=response_time,
+                )
+                _response_time_kwarg = "rt_us"
+            except TypeError:
+                # Upstream introduced a very annoying breaking change on the rt_ms/rt_us kwarg.
+                log_entry = formatter(
+                    status_code,
+                    environ,
+                    content_length,
+                    rt_ms=response_time,
+                )
+                _response_time_kwarg = "rt_ms"
     else:
-        formatter = ApacheFormatter(with_response_time=False)
-        log_entry = formatter(response.status_code, environ, len(response.content))
+        formatter = APACHE_FORMATTER_NO_RT
+        log_entry = formatter(status_code, environ, content_length)
 
-    logger.info(log_entry)
+    LOGGER.info(log_entry)
 
     return log_entry
 